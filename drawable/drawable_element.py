@@ -1,22 +1,27 @@
-from typing import (Final, List, Dict, Optional, Protocol, Type, Union, Any,
-                    TypeVar, Tuple, Generic, Iterable, final)
+from typing import (List, Dict, Optional, Protocol, Type, Union, Any,
+                    TypeVar, Tuple, Generic, Iterable, Iterator, final,
+                    get_type_hints)
 import os
-from copy import copy, deepcopy
+import sys
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import yaml
 import logging
 
 try:
-    # from HFSSdrawpy import Modeler, Body
-    from HFSSdrawpy.utils import parse_entry, Vector
-except ModuleNotFoundError:
-    Vector = list
-
-    def parse_entry(*args):
-        return args
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore
 
 
 class Modeler(Protocol):
-    """Protocol for Modeler from HFSSdrawpy."""
+    """Protocol for Modeler from HFSSdrawpy.
+
+    A modeler may also define set_variables(variables) taking a dictionary
+    {name: value} and returning {name: variable}. It is then used to declare
+    all the variables of an element in a single call.
+    """
 
     mode: str
 
@@ -41,18 +46,128 @@ def deep_update(
         base_dict: Dict[str, Any],
         update: Dict[str, Any]
 ) -> Dict[str, Any]:
-    """Update nested dictionaries."""
+    """Update nested dictionaries.
+
+    Nested levels are handled with an explicit stack instead of recursion.
+    """
+    if not update:
+        return base_dict
+    stack = [(base_dict, update)]
+    while stack:
+        base, sub_update = stack.pop()
+        if not any(hasattr(value, 'get') for value in sub_update.values()):
+            # Only leaves at this level.
+            base.update(sub_update)
+            continue
+        for key, value in sub_update.items():
+            if hasattr(value, 'get'):
+                sub_base = base.get(key)
+                if not hasattr(sub_base, 'get'):
+                    sub_base = base[key] = {}
+                stack.append((sub_base, value))
+            else:
+                base[key] = value
+    return base_dict
+
+
+@lru_cache(maxsize=None)
+def _hfss_utils() -> Tuple[Any, Any]:
+    """Return parse_entry and Vector, importing HFSSdrawpy on first use.
+
+    HFSSdrawpy pulls in the whole drawing toolkit, which is not needed to
+    load elements without a modeler or to dump yaml files.
+    """
+    try:
+        from HFSSdrawpy.utils import parse_entry, Vector
+    except ModuleNotFoundError:
+        Vector = list
+
+        def parse_entry(*args):
+            return args
+    return parse_entry, Vector
+
+
+@lru_cache(maxsize=4096)
+def _parse_str_entry(entry: str) -> Any:
+    return _hfss_utils()[0](entry)
+
+
+def _parse_entry(entry: Any) -> Any:
+    """Call parse_entry, memoized for strings.
+
+    The same dimensions ('10um', '0um', ...) appear in many elements.
+    """
+    if type(entry) is str:
+        return _parse_str_entry(entry)
+    return _hfss_utils()[0](entry)
+
+
+def _merge_cow(
+        base_dict: Dict[str, Any],
+        update: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return base_dict updated with update, without modifying base_dict.
+
+    Only the dictionaries on the path of an updated key are copied, the
+    other branches are shared with base_dict.
+    """
+    if not update:
+        return base_dict
+    merged = dict(base_dict)
+    if not any(hasattr(value, 'get') for value in update.values()):
+        # Only leaves at this level.
+        merged.update(update)
+        return merged
     for key, value in update.items():
         if hasattr(value, 'get'):
-            base_dict[key] = deep_update(
-                base_dict.get(key, {}), value)
+            sub_base = merged.get(key)
+            merged[key] = _merge_cow(
+                sub_base if hasattr(sub_base, 'get') else {}, value)
         else:
-            base_dict[key] = value
-    return base_dict
+            merged[key] = value
+    return merged
+
+
+def _fast_tree_copy(tree: Any) -> Any:
+    """Copy nested dicts and lists, sharing the leaves.
+
+    Parameters loaded from yaml only hold immutable scalars as leaves, so
+    this is equivalent to deepcopy without its memo and dispatch overhead.
+    """
+    if type(tree) is dict:
+        return {key: _fast_tree_copy(value) for key, value in tree.items()}
+    if type(tree) is list:
+        return [_fast_tree_copy(value) for value in tree]
+    return tree
+
+
+_LOAD_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def _load_pool() -> ThreadPoolExecutor:
+    """Return the pool of threads used to load yaml files, creating it once."""
+    global _LOAD_POOL  # pylint: disable=W0603
+    if _LOAD_POOL is None:
+        _LOAD_POOL = ThreadPoolExecutor(thread_name_prefix="drawable_yaml")
+    return _LOAD_POOL
+
+
+def _reset_load_pool() -> None:
+    """Forget the pool in a forked child, its threads only exist in the parent."""
+    global _LOAD_POOL  # pylint: disable=W0603
+    _LOAD_POOL = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_load_pool)
 
 
 _TL = TypeVar("_TL")
 
+# Kinds of annotated attributes, see DrawableElement._annotation_plan.
+# _RAW scalars are set as given, the others depend on the mode of the modeler.
+_ELEMENT, _VARIATION, _LIST, _SCALAR, _RAW, _UNKNOWN = range(6)
+
 
 class ImplementationError(Exception):
     """Raise on an implementation error using drawable."""
@@ -67,8 +182,10 @@ class DrawableElement:
         _name: Name of element.
         _mode: Mode of drawing.
         _modeler: Modeler used for drawing.
+        _yaml_cache: Parsed yaml files shared by all elements.
         to_draw: Wheter to draw the element.
-        Attributes sets in class file.
+        Attributes sets in class file. The ones whose name ends with '__n'
+        are set as given, without declaring a modeler variable.
 
     Methods:
         children: Returns list of childrens.
@@ -80,30 +197,156 @@ class DrawableElement:
         draw: Draw the element.
     """
 
+    # Framework state lives in slots, __dict__ holds the parameters and
+    # children set from the yaml files.
+    __slots__ = ('_folder', '_modeler', '_mode', '_name', '_parent',
+                 '_dict_params', '_inherited_cache', '_children_names',
+                 '_children_objs', '_variation_keys',
+                 '_name_prefix', '_reduced_name', '_pending_children',
+                 '_to_draw', '__dict__')
+
     __annotations__: Dict[str, Union[Any, Type["DrawableElement"]]]
     _folder: str
-    _parent: Optional["DrawableElement"] = None
+    _parent: Optional["DrawableElement"]
     _name: str
     _mode: str
-    _modeler: Optional[Modeler] = None
-    to_draw: bool = True
+    _modeler: Optional[Modeler]
+    _reduced_name: Optional[str]
+    _ann_plan: Dict[str, Tuple[int, Any]]
+    _yaml_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.draw is not DrawableElement.draw:
+            raise ImplementationError(
+                f"User should not override the draw method in class {cls}."
+                "He should implement _draw instead.")
+
+    @classmethod
+    def _annotation_plan(cls) -> Dict[str, Tuple[int, Any]]:
+        """Return the kind and type of every annotation of the class.
+
+        Annotations of the parent classes deriving from DrawableElement are
+        included. Computed on the first instantiation of the class, when the
+        classes named in string annotations are defined, and stored in
+        _ann_plan. Private annotations are not set from the parameters and
+        are left unevaluated.
+        """
+        plan = cls.__dict__.get("_ann_plan")
+        if plan is None:
+            annotations: Dict[str, Any] = {}
+            for base in reversed(cls.__mro__):
+                if (base is DrawableElement or
+                        not issubclass(base, DrawableElement)):
+                    continue
+                globalns = vars(sys.modules[base.__module__])
+                localns = dict(vars(base))
+                for key, cls_name in base.__dict__.get(
+                        "__annotations__", {}).items():
+                    if not key.startswith("_"):
+                        cls_name = cls._resolve_annotation(
+                            key, cls_name, globalns, localns)
+                    annotations[key] = cls_name
+            plan = {
+                key: cls._classify_annotation(key, cls_name)
+                for key, cls_name in annotations.items()}
+            cls._ann_plan = plan
+        return plan
+
+    @classmethod
+    def _resolve_annotation(
+        cls,
+        key: str,
+        cls_name: Any,
+        globalns: Dict[str, Any],
+        localns: Dict[str, Any]
+    ) -> Any:
+        """Evaluate the classes named by strings in an annotation.
+
+        Args:
+            key (str): Name of the attribute.
+            cls_name (Any): Annotation of the attribute.
+            globalns (Dict[str, Any]): Globals of the module of the class
+                                       defining the annotation.
+            localns (Dict[str, Any]): Namespace of that class.
+
+        Raises:
+            ImplementationError: If a class named in the annotation is not
+                                 defined.
+
+        Returns:
+            Any: The resolved annotation.
+        """
+        holder = SimpleNamespace(__annotations__={key: cls_name})
+        try:
+            return get_type_hints(holder, globalns, localns)[key]
+        except NameError as err:
+            raise ImplementationError(
+                f"Annotation '{key}' of {cls.__name__} cannot be resolved: "
+                f"{err}. Classes named in string annotations should be "
+                "defined at module level.") from err
+
+    @staticmethod
+    def _classify_annotation(key: str, cls_name: Any) -> Tuple[int, Any]:
+        """Return the kind of an annotation and the type used to parse it.
+
+        Args:
+            key (str): Name of the attribute.
+            cls_name (Any): Annotation of the attribute.
+
+        Returns:
+            Tuple[int, Any]: Kind of attribute and type of the element, which
+                             is the inner type for Variation and List.
+        """
+        if hasattr(cls_name, '__origin__'):
+            origin = cls_name.__origin__
+            if isinstance(origin, type):
+                if issubclass(origin, Variation):
+                    return _VARIATION, cls_name.__args__[0]
+                if issubclass(origin, List):  # type: ignore
+                    return _LIST, cls_name.__args__[0]
+            return _UNKNOWN, cls_name
+        if isinstance(cls_name, type) and issubclass(cls_name, DrawableElement):
+            return _ELEMENT, cls_name
+        if (cls_name is int or cls_name is float or cls_name is bool or
+                key.endswith("__n")):
+            return _RAW, cls_name
+        return _SCALAR, cls_name
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}: {self._name}>"
 
     def __str__(self) -> str:
-        string = ""
+        return "\n".join(self._str_lines())
+
+    def _str_lines(self, indent: str = "") -> List[str]:
+        """Return the lines of __str__, children being indented once more.
+
+        Args:
+            indent (str, optional): Prefix of every line. Defaults to "".
+
+        Returns:
+            List[str]: Lines describing the element.
+        """
+        lines: List[str] = []
         for key, attr in self.__dict__.items():
-            # attr = self.__dict__[k]
-            if key != "_parent":
-                if isinstance(attr, DrawableElement):
-                    repr_subel = str(attr).replace("\n", "\n  ")
-                    string += f"{key}:\n  {repr_subel},\n"
-                elif isinstance(attr, float):
-                    string += f"{key}: {attr:.4e},\n"
-                else:
-                    string += f"{key}: {attr},\n"
-        return f"{string[:-2]}"
+            if lines:
+                lines[-1] += ","
+            if isinstance(attr, DrawableElement):
+                lines.append(f"{indent}{key}:")
+                lines.extend(attr._str_lines(indent + "  "))
+            elif isinstance(attr, float):
+                lines.append(f"{indent}{key}: {attr:.4e}")
+            else:
+                lines.append(f"{indent}{key}: {attr}")
+        # Children not built yet are only named, building them would declare
+        # their variables.
+        for key, (cls, _) in self._pending_children.items():
+            if lines:
+                lines[-1] += ","
+            lines.append(f"{indent}{key}: "
+                         f"<{cls.__name__}: {self._name_prefix}{key}> (not built)")
+        return lines
 
     def __init__(
         self,
@@ -122,18 +365,21 @@ class DrawableElement:
             name: Name of the object.
             parent: Parent of the object.
         """
-        if type(self).draw is not DrawableElement.draw:
-            raise ImplementationError(
-                f"User should not override the draw method in class {type(self)}."
-                "He should implement _draw instead.")
-
-        logger.debug("Initializing %s", name)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Initializing %s", name)
 
         self._folder = folder
-        self._modeler: Final = modeler
-        self._mode: Final = "None" if self._modeler is None else self._modeler.mode
+        self._modeler = modeler
+        self._mode = "None" if self._modeler is None else self._modeler.mode
         self._name = name
-        self._parent: Final = parent
+        self._name_prefix = name + "_"
+        self._reduced_name = None
+        self._parent = parent
+        self._inherited_cache: Dict[str, Any] = {}
+        self._children_names: List[str] = []
+        self._children_objs: List[Optional[DrawableElement]] = []
+        self._pending_children: Dict[str, Tuple[type, Any]] = {}
+        self._to_draw = True
 
         # If params is a yaml file, load it.
         if isinstance(params, str):
@@ -147,106 +393,251 @@ class DrawableElement:
         else:
             self._dict_params = dict_params
 
+        # Find the keys of the variations once.
+        self._variation_keys: List[Tuple[str, str, int]] = []
+        for key in self._dict_params:
+            if "__" not in key:
+                continue
+            splt = key.rsplit("__", 1)
+            if splt[1].isdigit():
+                self._variation_keys.append((key, splt[0], int(splt[1])))
+
+        if "to_draw" in self._dict_params:
+            self.to_draw = self._dict_params["to_draw"]
+
         # Run through the dictionary and set variables.
         attrs_to_set, vars_to_set = self._parse_dict_params()
 
-        # Set children attributes
-        for attr in attrs_to_set:
-            setattr(
-                self, attr, self.__annotations__[attr](
-                    folder=self._folder,
-                    params=self._dict_params[attr],
-                    name=self._name + "_" + attr,
-                    modeler=self._modeler,
-                    parent=self
-                )
-            )
+        # Set children attributes, the ones that are not drawn are only built
+        # when accessed through __getattr__.
+        for attr, cls, params in attrs_to_set:
+            self._children_names.append(attr)
+            if isinstance(params, dict) and params.get("to_draw", True) is False:
+                self._pending_children[attr] = (cls, params)
+                self._children_objs.append(None)
+            else:
+                self._children_objs.append(self._build_child(attr, cls, params))
 
-        # Set variat ions object
-        for attr, cls in vars_to_set:
+        # Set variations object
+        for attr, cls, params in vars_to_set:
             original = cls(
                 folder=self._folder,
-                params=self._dict_params[attr],
-                name=self._name + "_" + attr,
+                params=params,
+                name=self._name_prefix + attr,
                 modeler=self._modeler,
                 parent=self
             )
-            setattr(self, attr, self.__annotations__[attr](  # type: ignore
-                variation=[],  # type: ignore
-                original=original,  # type: ignore
-            ))
+            setattr(self, attr, Variation(variation=[], original=original))
 
         # Set variation elements
-        for attr, sub_dict in self._dict_params.items():
-            splt = attr.split("__")
-            if splt[-1].isdigit():
-                var_key = splt[0]
-                for elm in splt[1:-1]:
-                    var_key += "__" + elm
-                var_index = int(splt[-1])
-                self._create_variation(sub_dict, var_key, var_index)
+        for attr, var_key, var_index in self._variation_keys:
+            self._create_variation(
+                self._dict_params[attr], var_key, var_index)
+
+    def __getattr__(self, name: str) -> Any:
+        """Build a child whose construction was deferred.
+
+        Only called when the attribute is not found the usual way.
+        """
+        if not name.startswith("_") and name in self._pending_children:
+            cls, params = self._pending_children.pop(name)
+            child = self._build_child(name, cls, params)
+            self._children_objs[self._children_names.index(name)] = child
+            return child
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _build_child(self, attr: str, cls: type, params: Any) -> "DrawableElement":
+        """Create a child element and set it as attribute.
+
+        Args:
+            attr (str): Name of the attribute.
+            cls (type): Class of the child.
+            params (Any): Parameters of the child.
+
+        Returns:
+            DrawableElement: The child.
+        """
+        child = cls(
+            folder=self._folder,
+            params=params,
+            name=self._name_prefix + attr,
+            modeler=self._modeler,
+            parent=self
+        )
+        setattr(self, attr, child)
+        return child
+
+    @property
+    def to_draw(self) -> bool:
+        """Whether to draw the element, given by 'to_draw' in its parameters."""
+        return self._to_draw
+
+    @to_draw.setter
+    def to_draw(self, value: bool) -> None:
+        if not isinstance(value, bool):
+            raise ValueError(
+                f"to_draw of {self._name} should be a boolean, got {value!r}.")
+        self._to_draw = value
 
     def _load_files(self, dict_params: Dict[str, Any]) -> Dict[str, Any]:
-        for k, v in dict_params.items():
-            if isinstance(v, str) and v.endswith(".yaml"):
-                dict_params[k] = self._load_dict_from_file(v)
-        for k, v in dict_params.items():
-            if isinstance(v, dict):
-                dict_params[k] = self._load_files(v)
+        """Replace every '.yaml' value of the tree by the loaded dictionary.
+
+        The files referenced at a given depth are loaded concurrently, then
+        the loaded dictionaries are searched for further references.
+
+        Args:
+            dict_params (Dict[str, Any]): Parameters to complete in place.
+
+        Returns:
+            Dict[str, Any]: Completed parameters.
+        """
+        to_search = [dict_params]
+        while to_search:
+            locations = []
+            while to_search:
+                local = to_search.pop()
+                for k, v in local.items():
+                    if isinstance(v, str) and v.endswith(".yaml"):
+                        locations.append((local, k, v))
+                    elif isinstance(v, dict):
+                        to_search.append(v)
+
+            loaded = self._load_dicts_from_files(
+                list({path for _, _, path in locations}))
+            used = set()
+            for local, k, path in locations:
+                # Every reference gets its own tree, as when loaded one by one.
+                local[k] = _fast_tree_copy(loaded[path]) \
+                    if path in used else loaded[path]
+                used.add(path)
+                if isinstance(local[k], dict):
+                    to_search.append(local[k])
         return dict_params
 
-    def _parse_dict_params(self) -> Tuple[List[str],
-                                          List[Tuple[str, Type['DrawableElement']]]]:
+    def _load_dicts_from_files(
+        self,
+        file_paths: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Load several yaml files using a pool of threads.
+
+        Args:
+            file_paths (List[str]): Paths of the files relative to _folder.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Loaded dictionary for every path.
+        """
+        if len(file_paths) <= 1:
+            return {path: self._load_dict_from_file(path) for path in file_paths}
+        return dict(zip(file_paths,
+                        _load_pool().map(self._load_dict_from_file, file_paths)))
+
+    def _parse_dict_params(self) -> Tuple[
+            List[Tuple[str, Type['DrawableElement'], Any]],
+            List[Tuple[str, Type['DrawableElement'], Any]]]:
         """Assign values from self._dict_param to attr.
 
         Run through the attributes defined in class.
-        Typing is used to determine how to set the attributes.
+        Typing is used to determine how to set the attributes, the kind of
+        each annotation is resolved once per class by _annotation_plan.
         Returns:
-            attr_to_set: Attributes of type DrawableElement to set.
-            vars_to_set: Variations to set.
+            attr_to_set: Attributes of type DrawableElement to set, with their
+                         class and parameters.
+            vars_to_set: Variations to set, with the class of the element and
+                         its parameters.
         """
         attr_to_set = []
         variations_to_set = []
-        for key, cls_name in self.__annotations__.items():
-            if key in self._dict_params:
-                if hasattr(cls_name, '__origin__'):
-                    if issubclass(cls_name.__origin__, Variation):  # type: ignore
-                        variations_to_set.append([key, cls_name.__args__[0]])  # type: ignore
-                    elif issubclass(cls_name.__origin__, List):  # type: ignore
-                        self._set_list(
-                            key, cls_name.__args__[0], self._dict_params[key])  # type: ignore
-                    else:
-                        raise ValueError(
-                            f"Unknown type {cls_name}. Should be either Variation or List.")
-                elif issubclass(cls_name, DrawableElement):
-                    attr_to_set.append(key)
+        variables: Dict[str, Any] = {}
+        dict_params = self._dict_params
+        for key, (kind, cls_name) in self._annotation_plan().items():
+            if key in dict_params:
+                value = dict_params[key]
+                if kind == _RAW:
+                    setattr(self, key, value)
+                elif kind == _SCALAR:
+                    self._set_element(key, cls_name, value, variables)
+                elif kind == _ELEMENT:
+                    attr_to_set.append((key, cls_name, value))
+                elif kind == _VARIATION:
+                    variations_to_set.append((key, cls_name, value))
+                elif kind == _LIST:
+                    # Keep the order of declaration of the annotations, a
+                    # variable may be defined from the previous ones.
+                    self._set_variables(variables)
+                    variables.clear()
+                    self._set_list(key, cls_name, value)
                 else:
-                    self._set_element(key, cls_name, self._dict_params[key])
+                    raise ValueError(
+                        f"Unknown type {cls_name}. Should be either Variation or List.")
             elif not key.startswith("_"):
                 self._search_in_parents(key)
 
+        self._set_variables(variables)
         return attr_to_set, variations_to_set
 
-    def _set_element(self, key: str, cls_name: type, value: Any) -> None:
+    def _set_element(
+        self,
+        key: str,
+        cls_name: type,
+        value: Any,
+        variables: Optional[Dict[str, Any]] = None
+    ) -> None:
         """Set an attribute of the class to a value.
 
+        Only called for _SCALAR annotations, the int, float, bool and '__n'
+        ones are _RAW and set as given by _parse_dict_params.
+
         Args:
             key (str): Key of the element in _dict_params.
             cls_name (type): Type of the element.
             value (Any): Value from _dict_params.
+            variables (Dict[str, Any], optional): If given, values to declare
+                as modeler variables are collected in it and set later by
+                _set_variables.
         """
-        if (cls_name in [int, float, bool] or
-                self._modeler is None or
-                key.endswith("__n")):
+        if self._modeler is None:
             setattr(self, key, value)
         elif self._mode == "gds":
-            setattr(self, key, parse_entry(value))
+            setattr(self, key, _parse_entry(value))
+        elif variables is not None:
+            # Set now to keep the order of the attributes, replaced by the
+            # variable in _set_variables.
+            setattr(self, key, value)
+            variables[key] = value
         else:
-            setattr(
-                self,
-                key,
-                self._modeler.set_variable(
-                    value, name=self.name + "_" + key))
+            self._set_variables({key: value})
+
+    def _set_variables(self, variables: Dict[str, Any]) -> None:
+        """Declare modeler variables and set the attributes to the results.
+
+        Args:
+            variables (Dict[str, Any]): Values from _dict_params by key.
+        """
+        if not variables:
+            return
+        prefix = self._name_prefix
+        names = {key: sys.intern(prefix + key) for key in variables}
+        results = self._declare_variables(
+            {names[key]: value for key, value in variables.items()})
+        for key in variables:
+            setattr(self, key, results[names[key]])
+
+    def _declare_variables(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Declare variables to the modeler, in one call when it allows it.
+
+        Args:
+            variables (Dict[str, Any]): Values by variable name.
+
+        Returns:
+            Dict[str, Any]: Variables returned by the modeler by name.
+        """
+        set_variables = getattr(self._modeler, "set_variables", None)
+        if set_variables is not None:
+            return set_variables(variables)
+        set_variable = self._modeler.set_variable  # type: ignore
+        return {name: set_variable(value, name=name)
+                for name, value in variables.items()}
 
     def _list_attr(
         self,
@@ -272,18 +663,21 @@ class DrawableElement:
                 for i, elm in enumerate(value_list)
             ]
 
-        if cls_name in [int, float, bool] or self._mode == "None":
-            return value_list
-        if self._mode == "gds":
-            return Vector([parse_entry(v) for v in value_list])
-
-        n_el = len(value_list)
-        labels = ["x", "y", "z"] if n_el < 4 else range(n_el)
-        return Vector([
-            self._modeler.set_variable(  # type: ignore
-                v, name=f"{self.name}_{key}_{index}_{n}")
-            for n, v in zip(labels, value_list)
-        ])
+        mode = self._mode
+        if (mode == "None" or
+                cls_name is int or cls_name is float or cls_name is bool):
+            # The parameters may be shared with variations, copy the list
+            # so that every element owns its attribute.
+            return list(value_list) if type(value_list) is list else value_list
+        if mode == "gds":
+            return _hfss_utils()[1]([_parse_entry(v) for v in value_list])
+
+        prefix = f"{self._name_prefix}{key}_{index}_"
+        labels = ["x", "y", "z"] if len(value_list) < 4 else range(len(value_list))
+        names = [f"{prefix}{n}" for n in labels]
+        results = self._declare_variables(dict(zip(names, value_list)))
+        return _hfss_utils()[1](
+            [results[name] for name in names[:len(value_list)]])
 
     def _set_list(self,
                   key: str,
@@ -292,7 +686,7 @@ class DrawableElement:
         setattr(self, key, self._list_attr(cls_name, value_list, key))
 
     def _search_in_parents(self, key: str) -> None:
-        """Recursively run through the parents to find an attribute.
+        """Run through the parents to find an attribute.
 
         Args:
             key (str): Key to search.
@@ -300,21 +694,43 @@ class DrawableElement:
         Raises:
             KeyError: Raised if element is nowhere to be found in parents.
         """
-        local_parent = copy(self._parent)
+        visited = []
+        local_parent = self._parent
         while local_parent is not None:
-            if key in local_parent.__dict__:
-                setattr(self, key, local_parent.__dict__[key])
-                return
-            else:
-                local_parent = local_parent.parent
-        raise KeyError(
-            f"Key {key} should be defined in .yaml file "
-            f"in {self.__class__.__name__} or "
-            "in it's parents.")
+            parent_dict = local_parent.__dict__
+            if key in parent_dict:
+                value = parent_dict[key]
+                break
+            if key in local_parent._pending_children:  # pylint: disable=W0212
+                value = getattr(local_parent, key)
+                break
+            inherited = local_parent._inherited_cache  # pylint: disable=W0212
+            if key in inherited:
+                value = inherited[key]
+                break
+            visited.append(local_parent)
+            local_parent = local_parent._parent
+        else:
+            raise KeyError(
+                f"Key {key} should be defined in .yaml file "
+                f"in {self.__class__.__name__} or "
+                "in it's parents.")
+
+        # Remember the value on the intermediate parents so that siblings
+        # resolving the same key stop at the first parent.
+        for parent in visited:
+            parent._inherited_cache[key] = value  # pylint: disable=W0212
+        setattr(self, key, value)
+        if isinstance(value, DrawableElement):
+            self._children_names.append(key)
+            self._children_objs.append(value)
 
     def _load_dict_from_file(self, file_path: str) -> Dict[str, Any]:
         """Load Yaml file for an attribute parameters.
 
+        Parsed files are cached by path and reloaded when their modification
+        time or size changes.
+
         Args:
             file_path (str): file_path that should end with '.yaml'.
 
@@ -329,8 +745,16 @@ class DrawableElement:
                 f"Element {self._name} has dict params file that "
                 f"does not ends with '.yaml': {file_path}")
 
-        with open(f"{self._folder}/{file_path}", 'r', encoding="utf-8") as file:
-            return yaml.safe_load(file.read())
+        path = os.path.realpath(f"{self._folder}/{file_path}")
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._yaml_cache.get(path)
+        if cached is None or cached[0] != stamp:
+            with open(path, 'rb') as file:
+                cached = (stamp, yaml.load(file, Loader=_YamlLoader))
+            self._yaml_cache[path] = cached
+        # Callers mutate the dictionary, keep the cached one untouched.
+        return _fast_tree_copy(cached[1])
 
     @staticmethod
     def _complete_dict(sub_dict: Dict[str, Any]) -> Dict[str, Any]:
@@ -345,10 +769,12 @@ class DrawableElement:
         Returns:
             Dict[str, Any]: Dictionnary completed with full structure.
         """
-        sub_dict = deepcopy(sub_dict)
-        full_dict = {}
+        if not any("." in key for key in sub_dict):
+            return _fast_tree_copy(sub_dict)
 
-        for key, val in list(sub_dict.items()):
+        full_dict: Dict[str, Any] = {}
+        for key, val in sub_dict.items():
+            val = _fast_tree_copy(val)
             if "." not in key:
                 full_dict[key] = val
                 continue
@@ -375,15 +801,16 @@ class DrawableElement:
             raise ValueError(
                 f"To have variation '{kv}__{indv}', the attribute "
                 f"'{kv}' should be defined inside the class.")
-        variation = deepcopy(self._dict_params[kv])
-        if sub_dict is not None:
-            sub_dict = self._complete_dict(sub_dict)
-            variation = deep_update(variation, sub_dict)
-        var_lst.append(self.__annotations__[kv].__args__[0](  # type: ignore
+        # The branches not touched by the variation are shared with the
+        # original parameters, lists are copied when set as attributes.
+        variation = self._dict_params[kv]
+        if sub_dict:
+            variation = _merge_cow(variation, self._complete_dict(sub_dict))
+        var_lst.append(self._annotation_plan()[kv][1](
             folder=self._folder,
             params=variation,
             modeler=self._modeler,
-            name=self._name + f"_{kv}_{indv}",
+            name=f"{self._name_prefix}{kv}_{indv}",
             parent=self
         ))
 
@@ -391,17 +818,12 @@ class DrawableElement:
     def children(self) -> List[str]:
         """Return the list of children of this DrawableElement.
 
+        The names are recorded when the children are set during __init__.
+
         Returns:
             List["DrawableElement"]: Children.
         """
-        children: List[str] = []
-        for var_name, var_type in self.__dict__.items():
-            if (
-                isinstance(var_type, DrawableElement) and
-                not var_name.startswith("_")
-            ):
-                children.append(var_name)
-        return children
+        return list(self._children_names)
 
     @property
     def parent(self) -> Optional["DrawableElement"]:
@@ -413,11 +835,16 @@ class DrawableElement:
 
     @property
     def reduced_name(self) -> str:
+        if self._reduced_name is None:
+            self._reduced_name = self._compute_reduced_name()
+        return self._reduced_name
+
+    def _compute_reduced_name(self) -> str:
         splt = self._name.split("_")
         n_max = 30
         name = splt.pop()
         name_len = len(name)
-        for elm in splt[::-1]:
+        for elm in reversed(splt):
             elm_len = len(elm)
             if elm_len + name_len >= n_max:
                 return name
@@ -443,9 +870,24 @@ class DrawableElement:
                 continue
             params[key] = attr._create_dictionary() \
                 if isinstance(attr, DrawableElement) else ""  # pylint: disable=W0212
+        for key, (cls, _) in self._pending_children.items():
+            params[key] = cls._class_dictionary()
 
         return params
 
+    @classmethod
+    def _class_dictionary(cls) -> Dict[str, Any]:
+        """Create the dictionary of _create_dictionary from the annotations.
+
+        Used for the children that are not built.
+        Returns:
+            Dict[str, Any]: Dictionary of class structure.
+        """
+        return {
+            key: cls_name._class_dictionary() if kind == _ELEMENT else ""
+            for key, (kind, cls_name) in cls._annotation_plan().items()
+            if not key.startswith("_")}
+
     def create_yaml_file(self,
                          filename: str,
                          folder: Optional[str] = None) -> None:
@@ -482,23 +924,27 @@ class DrawableElement:
         sub_len: int,
         sub_variation: Dict[str, Any]
     ) -> Dict[str, Any]:
+        # Split the paths once, they are the same for every index.
+        parsed_keys = []
+        for key, var_lst in sub_variation.items():
+            splt = key.split(".")
+            if splt[0] != sub_key:
+                raise ImplementationError(
+                    f"Subvariation ({splt}) is not for the right key "
+                    f"({sub_key})")
+            parsed_keys.append((splt[1:-1], splt[-1], var_lst))
+
         result = {}
         for ind in range(sub_len):
-            result[f"{sub_key}__{ind}"] = {}
-            for k, var_lst in sub_variation.items():
-                splt = k.split(".")
-                if splt[0] != sub_key:
-                    raise ImplementationError(
-                        f"Subvariation ({splt}) is not for the right key "
-                        f"({sub_key})")
-                local = result[f"{sub_key}__{ind}"]
-                for k in splt[1:-1]:
-                    if k not in local:
-                        local[k] = {}
-                    local = local[k]
-                if splt[-1] in local:
+            local_root: Dict[str, Any] = {}
+            result[f"{sub_key}__{ind}"] = local_root
+            for path, leaf, var_lst in parsed_keys:
+                local = local_root
+                for k in path:
+                    local = local.setdefault(k, {})
+                if leaf in local:
                     raise ValueError("Same variable is sweeped twice.")
-                local[splt[-1]] = var_lst[ind]
+                local[leaf] = var_lst[ind]
         return result
 
     def create_variation_yaml_file(
@@ -531,7 +977,7 @@ class DrawableElement:
                 dict_vars_len[k_0] = len(value)  # type: ignore
                 dict_vars_div[k_0] = {key: value}
 
-        yaml_dict = deepcopy(self._dict_params)
+        yaml_dict = _fast_tree_copy(self._dict_params)
 
         to_pop = []
         for key in yaml_dict.keys():
@@ -559,20 +1005,37 @@ class DrawableElement:
         Core function to draw an element. This is the one that should be
         overwritten in the classes deriving from DrawableElement.
         """
-        for child in self.children:
-            attribute: DrawableElement = getattr(self, child)
-            attribute.draw(body, **kwargs)
+        for child in self._children_objs:
+            if child is not None:
+                child.draw(body, **kwargs)
 
-        if len(self.children) == 0:
+        if not self._children_objs:
             raise NotImplementedError(
                 f"_draw() of {self.__class__.__name__} is not implemented")
 
     @final
     def draw(self, body: Body, **kwargs) -> None:
-        """Call _draw if if object is 'to_draw'."""
-        if self.to_draw:
-            logger.debug("Drawing %s", self.name)
-            self._draw(body, **kwargs)
+        """Call _draw if if object is 'to_draw'.
+
+        Elements keeping the default _draw only draw their children, so the
+        tree is walked with a stack and _draw is called only on the elements
+        that implement it.
+        """
+        debug = logger.isEnabledFor(logging.DEBUG)
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            if element is None or not element.to_draw:
+                continue
+            if debug:
+                logger.debug("Drawing %s", element._name)
+            if type(element)._draw is not DrawableElement._draw:
+                element._draw(body, **kwargs)
+            elif element._children_objs:
+                stack.extend(reversed(element._children_objs))
+            else:
+                raise NotImplementedError(
+                    f"_draw() of {element.__class__.__name__} is not implemented")
 
 
 _Tvar = TypeVar("_Tvar", bound=DrawableElement)
@@ -581,42 +1044,44 @@ _Tvar = TypeVar("_Tvar", bound=DrawableElement)
 class Variation(Generic[_Tvar]):
     """Class to handle variation of an element."""
 
+    # __dict__ holds the parameters copied from the original element.
+    __slots__ = ('variations', '_original', '__dict__')
+
     variations: List[_Tvar]
     to_draw: bool = True
 
-    _len: int
-    _n_iter: int = 0
-
     def __init__(
         self,
         variation: List[_Tvar],
         original: _Tvar,
     ):
         self.variations = variation
-        self._len = len(self.variations)
+        self._original = original
         for attr, value in original.__dict__.items():
             if not attr.startswith('_'):
                 setattr(self, attr, value)
 
-    def __iter__(self) -> "Variation":
-        self._n_iter = 0
-        return self
+    def __getattr__(self, name: str) -> Any:
+        """Get a child of the original whose construction was deferred."""
+        if not name.startswith("_"):
+            original = self._original
+            if name in original._pending_children:  # pylint: disable=W0212
+                value = getattr(original, name)
+                setattr(self, name, value)
+                return value
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __iter__(self) -> Iterator[_Tvar]:
+        return iter(self.variations)
 
     def __getitem__(self, item):
         return self.variations[item]
 
-    def __next__(self) -> _Tvar:
-        if self._n_iter < self._len:
-            result = self.variations[self._n_iter]
-            self._n_iter += 1
-            return result
-        raise StopIteration
-
     def __len__(self):
-        return self._len
+        return len(self.variations)
 
     def append(self, elm: _Tvar) -> None:
-        self._len += 1
         self.variations.append(elm)
 
     @final
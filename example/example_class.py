@@ -24,90 +24,99 @@ class Junction(DrawableElement):
     # Elements taken from parents
     pad_spacing: str
 
+    # Suffixes of the rectangles drawn in hfss and gds modes.
+    _NAMES_HFSS = ("_left_con", "_right_con")
+    _NAMES_GDS = ("_left_con", "_finger_down", "_figer_right",
+                  "_right_con", "_right_bot_con")
+
     def _draw(self, body: Body, **kwargs) -> None:
-        h_gap = (self.finger_gap + self.finger_length)/2
+        name = self.name
+        c_height = self.connector_height
+        f_width = self.finger_width
+        f_gap = self.finger_gap
+        f_length = self.finger_length
+
+        h_gap = (f_gap + f_length)/2
 
         connector_l = self.pad_spacing/2 - h_gap
 
         if self._mode == "hfss":
-            positions = [[-connector_l-h_gap, -self.connector_height/2],
-                         [h_gap, -self.connector_height/2]]
-            dimensions = [[connector_l, self.connector_height],
-                          [connector_l, self.connector_height]]
-            names_ad = ["_left_con", "_right_con", ]
-            for p, d, n in zip(positions, dimensions, names_ad):
-                body.rect(p, d, name=self.name+n, layer=TRACK)
+            positions = [[-connector_l-h_gap, -c_height/2],
+                         [h_gap, -c_height/2]]
+            dimensions = [[connector_l, c_height],
+                          [connector_l, c_height]]
+            for p, d, n in zip(positions, dimensions, self._NAMES_HFSS):
+                body.rect(p, d, name=name+n, layer=TRACK)
 
             jct = body.rect_center(
                 [0, 0],
-                [2*h_gap, self.connector_height],
+                [2*h_gap, c_height],
                 layer=RLC,
-                name=self.name+"_jct"
+                name=name+"_jct"
             )
             points = [(-h_gap, 0), (h_gap, 0)]
-            body.polyline(points, closed=False, name=self.name + "_line")
+            body.polyline(points, closed=False, name=name + "_line")
             jct.assign_lumped_RLC(
                 points, (0, self.lj, 0))
 
             mesh_rect = body.rect_center(
                 [0, 0],
                 [2*self.pad_spacing,
-                 self.connector_height],
-                name=self.name+"_jct_mesh")
-            mesh_rect.assign_mesh_length(self.connector_height/2)
+                 c_height],
+                name=name+"_jct_mesh")
+            mesh_rect.assign_mesh_length(c_height/2)
 
         else:
+            u_width = self.undercut_width
+            margin = self.margin
+            layer = self.layer
+            layer_undercut = self.layer_undercut
+            f_width_ratio = f_width*self.ratio_finger_width
+
             positions = [
-                [-connector_l-h_gap, -self.connector_height/2],
-                [-self.finger_width*self.ratio_finger_width-h_gap,
-                 -self.finger_length - self.connector_height/2],
-                [-h_gap + self.finger_gap,
-                 -(self.connector_height + self.finger_length +
-                   self.finger_width)/2],
-                [h_gap, -self.connector_height/2],
-                [h_gap, -self.connector_height/2 - self.finger_length]
+                [-connector_l-h_gap, -c_height/2],
+                [-f_width_ratio-h_gap,
+                 -f_length - c_height/2],
+                [-h_gap + f_gap,
+                 -(c_height + f_length + f_width)/2],
+                [h_gap, -c_height/2],
+                [h_gap, -c_height/2 - f_length]
             ]
 
             dimensions = [
-                [connector_l, self.connector_height],
-                [self.finger_width*self.ratio_finger_width,
-                 self.finger_length],
-                [self.finger_length, self.finger_width],
-                [connector_l, self.connector_height],
-                [self.connector_height, self.finger_length]]
-
-            names_ad = ["_left_con", "_finger_down", "_figer_right",
-                        "_right_con", "_right_bot_con"]
+                [connector_l, c_height],
+                [f_width_ratio, f_length],
+                [f_length, f_width],
+                [connector_l, c_height],
+                [c_height, f_length]]
 
             marged_el = []
-            marg_vect = Vector([self.margin]*2)
+            marg_vect = Vector([margin]*2)
+            marg_dims = 2*marg_vect
 
-            for p, d, n in zip(positions, dimensions, names_ad):
-                body.rect(p, d, name=self.name+n, layer=self.layer)
+            for p, d, n in zip(positions, dimensions, self._NAMES_GDS):
+                body.rect(p, d, name=name+n, layer=layer)
                 marged_el.append(body.rect(
                     Vector(p)-marg_vect,
-                    Vector(d)+2*marg_vect,
-                    name=self.name+n+"_marged",
-                    layer=self.layer_undercut))
+                    Vector(d)+marg_dims,
+                    name=name+n+"_marged",
+                    layer=layer_undercut))
 
             undercut_1 = body.rect(
-                [-self.finger_width - h_gap - self.undercut_width,
-                 -self.finger_length - self.connector_height/2 -
-                 self.undercut_width],
-                [2*self.undercut_width + self.finger_width,
-                 self.undercut_width + self.finger_length +
-                 self.connector_height],
-                name=self.name+"_undercut_down",
-                layer=self.layer_undercut)
+                [-f_width - h_gap - u_width,
+                 -f_length - c_height/2 - u_width],
+                [2*u_width + f_width,
+                 u_width + f_length + c_height],
+                name=name+"_undercut_down",
+                layer=layer_undercut)
 
             undercut_2 = body.rect(
-                [-h_gap+self.finger_gap - self.undercut_width,
-                 -(self.connector_height + self.finger_length +
-                   self.finger_width)/2 - self.undercut_width],
-                [self.finger_length + self.undercut_width-self.margin,
-                 2*self.undercut_width+self.finger_width],
-                name=self.name+"_undercut_right",
-                layer=self.layer_undercut)
+                [-h_gap+f_gap - u_width,
+                 -(c_height + f_length + f_width)/2 - u_width],
+                [f_length + u_width-margin,
+                 2*u_width+f_width],
+                name=name+"_undercut_right",
+                layer=layer_undercut)
             undercut_1.unite(undercut_2)
             undercut_1.subtract(marged_el)
 
@@ -159,15 +168,18 @@ class Transmon(DrawableElement):
             name=self.name+"_cutout",
             layer=GAP
         )
-        cutout.fillet(self.fillet)
+        fillet = self.fillet
+        cutout.fillet(fillet)
+        pad_dims = self.pad_dims
+        pad_y = (pad_dims[1] + self.pad_spacing)/2
         for sign, n in zip([-1, 1], ["bot", "top"]):
             pad = body.rect_center(
-                [0, sign*(self.pad_dims[1] + self.pad_spacing)/2],
-                self.pad_dims,
+                [0, sign*pad_y],
+                pad_dims,
                 name=self.name + f"_{n}_pad",
                 layer=TRACK
             )
-            pad.fillet(self.fillet)
+            pad.fillet(fillet)
         self.coupling_pad.draw(body=body, **kwargs)
 
 
@@ -199,10 +211,9 @@ class ChipDesign(DrawableElement):
             [0, 0], self.dims, layer=TRACK)
 
         gap_el = body.entities.get(GAP, None)
-        if len(gap_el) >= 1:
-            gap_el[0].unite(gap_el[1:])
-
-        if gap_el is not None:
+        if gap_el:
+            if len(gap_el) > 1:
+                gap_el[0].unite(gap_el[1:])
             self._ground_plane.subtract(gap_el)
         self._ground_plane.unite(body.entities[TRACK])
         self._ground_plane.assign_perfect_E()
@@ -243,10 +254,9 @@ class Chip(DrawableElement):
         self._ground_plane = body.rect([0, 0], self.dims, layer=TRACK)
 
         gap_el = body.entities.get(GAP, None)
-        if len(gap_el) >= 1:
-            gap_el[0].unite(gap_el[1:])
-
-        if gap_el is not None:
+        if gap_el:
+            if len(gap_el) > 1:
+                gap_el[0].unite(gap_el[1:])
             self._ground_plane.subtract(gap_el)
         self._ground_plane.unite(body.entities[TRACK])
         self._ground_plane.assign_perfect_E()
@@ -1,5 +1,11 @@
 
+import os
+import shutil
+import signal
+import tempfile
 import unittest
+from unittest import mock
+from drawable.drawable_element import DrawableElement, ImplementationError
 from . import elements
 
 
@@ -50,6 +56,19 @@ class BasicTest(unittest.TestCase):
                          ['sample param_int_123 123',
                           'sample param_str_abc abc'])
 
+    def test_inherited_annotations(self):
+        self.chip = elements.ExtendedSample(
+            folder="tests/yaml_files",
+            params="extended.yaml",
+            modeler=None,
+            name="chip"
+        )
+        logs = self.draw()
+        self.assert_logs(logs,
+                         ['sample param_int_123 123',
+                          'sample param_str_abc abc',
+                          'extended param_extra 42'])
+
     def test_parent(self):
         self.chip = elements.Parent(
             folder="tests/yaml_files",
@@ -78,6 +97,215 @@ class BasicTest(unittest.TestCase):
                           'parent param_int_123 456',
                           'parent param_int_parent 789'])
 
+    def test_inherited(self):
+        self.chip = elements.Root(
+            folder="tests/yaml_files",
+            params="inherited.yaml",
+            modeler=None,
+            name="chip"
+        )
+        logs = self.draw()
+        self.assert_logs(logs,
+                         ['inherited chip_middle_child1 param_int_parent 789',
+                          'inherited chip_middle_child2 param_int_parent 789'])
+
+    def test_not_drawn(self):
+        self.chip = elements.Root(
+            folder="tests/yaml_files",
+            params="not_drawn.yaml",
+            modeler=None,
+            name="chip"
+        )
+        self.assertNotIn("child1", vars(self.chip.middle))
+        logs = self.draw()
+        self.assert_logs(logs,
+                         'inherited chip_middle_child2 param_int_parent 789')
+        self.assertFalse(self.check_logs(logs, "chip_middle_child1", 0))
+        self.assertNotIn("child1", vars(self.chip.middle))
+
+        text = str(self.chip)
+        self.assertIn("child1: <Inherited: chip_middle_child1> (not built)",
+                      text)
+        template = self.chip._create_dictionary()
+        self.assertEqual(template["middle"],
+                         {"child1": {"param_int_parent": ""},
+                          "child2": {"param_int_parent": ""}})
+        self.assertNotIn("child1", vars(self.chip.middle))
+
+        child1 = self.chip.middle.child1
+        self.assertFalse(child1.to_draw)
+        self.assertNotIn("to_draw", vars(child1))
+        self.assertEqual(child1._create_dictionary(),
+                         template["middle"]["child1"])
+        self.assertEqual(child1.param_int_parent, 789)
+        self.assertEqual(self.chip.middle.children, ["child1", "child2"])
+
+    def test_not_drawn_variation(self):
+        self.chip = elements.RootVariation(
+            folder="tests/yaml_files",
+            params="not_drawn_variation.yaml",
+            modeler=None,
+            name="chip"
+        )
+        self.assertNotIn("child1", vars(self.chip.middle._original))
+        self.assertNotIn("child1", vars(self.chip.middle[0]))
+        self.assertEqual(self.chip.middle.child1.param_int_parent, 789)
+
+    def test_to_draw_type(self):
+        with self.assertRaises(ValueError):
+            elements.Sample(folder="tests/yaml_files",
+                            params={"param_int_123": 1, "param_str_abc": "a",
+                                    "to_draw": ""},
+                            modeler=None, name="chip")
+
+    def test_variation(self):
+        self.chip = elements.Multi(
+            folder="tests/yaml_files",
+            params="variation.yaml",
+            modeler=None,
+            name="chip"
+        )
+        self.assertEqual(len(self.chip.sample1), 2)
+        self.assertEqual(self.chip.sample1.param_int_123, 123)
+        logs = self.draw()
+        self.assert_logs(logs,
+                         ['sample param_int_123 321',
+                          'sample param_str_abc abc',
+                          'sample param_int_123 123',
+                          'sample param_str_abc cba'])
+
+    def test_override_draw(self):
+        with self.assertRaises(ImplementationError):
+            class Overriding(elements.DrawableElement):  # pylint: disable=W0612
+                def draw(self, body, **kwargs):
+                    pass
+
+    def test_unresolved_annotation(self):
+        class LocalChild(elements.Sample):
+            pass
+
+        class Holder(DrawableElement):
+            child: "LocalChild"
+
+        with self.assertRaisesRegex(ImplementationError, "LocalChild"):
+            Holder(folder="tests/yaml_files", params={"child": {"x": 1}},
+                   modeler=None, name="chip")
+
+    def test_modeler_variables(self):
+        params = {"width": "1um", "pos": ["0um", "2um"], "height": "3um"}
+        expected = ["chip_width", "chip_pos_0_x", "chip_pos_0_y",
+                    "chip_height"]
+        for modeler in [elements.FakeModeler(), elements.FakeBatchModeler()]:
+            rect = elements.Rect(folder="tests/yaml_files", params=params,
+                                 modeler=modeler, name="chip")
+            self.assertEqual(modeler.declared, expected)
+            self.assertEqual(list(vars(rect)), ["width", "pos", "height"])
+            self.assertEqual(rect.width, "chip_width=1um")
+            self.assertEqual(list(rect.pos),
+                             ["chip_pos_0_x=0um", "chip_pos_0_y=2um"])
+            self.assertEqual(rect.height, "chip_height=3um")
+
+    def test_constant_parameter(self):
+        modeler = elements.FakeModeler()
+        scaled = elements.Scaled(folder="tests/yaml_files",
+                                 params={"ratio__n": "0.5", "length": 2},
+                                 modeler=modeler, name="chip")
+        self.assertEqual(modeler.declared, ["chip_length"])
+        self.assertEqual(scaled.ratio__n, "0.5")
+        self.assertEqual(scaled.length, "chip_length=2")
+
+    def test_type_checking_annotation(self):
+        self.chip = elements.Guarded(
+            folder="tests/yaml_files",
+            params="sample.yaml",
+            modeler=None,
+            name="chip"
+        )
+        logs = self.draw()
+        self.assert_logs(logs, 'sample param_int_123 123')
+
+    def test_yaml_cache(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "sample.yaml")
+            shutil.copy("tests/yaml_files/sample.yaml", path)
+            first = elements.Sample(folder=folder, params="sample.yaml",
+                                    modeler=None, name="chip")
+            first._dict_params["param_int_123"] = 0
+            second = elements.Sample(folder=folder, params="sample.yaml",
+                                     modeler=None, name="chip")
+            self.assertEqual(second.param_int_123, 123)
+
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("param_int_123: 456\nparam_str_abc: abc\n")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            third = elements.Sample(folder=folder, params="sample.yaml",
+                                    modeler=None, name="chip")
+            self.assertEqual(third.param_int_123, 456)
+
+    def test_several_files(self):
+        load = DrawableElement._load_dicts_from_files
+        with mock.patch.object(DrawableElement, "_load_dicts_from_files",
+                               autospec=True, side_effect=load) as spy:
+            self.chip = elements.Trio(
+                folder="tests/yaml_files",
+                params="trio.yaml",
+                modeler=None,
+                name="chip"
+            )
+        self.assertEqual(sorted(spy.call_args_list[0].args[1]),
+                         ["extended.yaml", "sample.yaml"])
+
+        params = self.chip._dict_params
+        self.assertIsNot(params["sample1"], params["sample2"])
+        params["sample1"]["param_int_123"] = 0
+        self.assertEqual(params["sample2"]["param_int_123"], 123)
+        self.assertEqual(self.chip.sample3.param_extra, 42)
+        logs = self.draw()
+        self.assert_logs(logs, ['sample param_str_abc abc',
+                                'extended param_extra 42'])
+
+    def test_list_not_given_as_list(self):
+        for value in [None, "", "0um"]:
+            point = elements.Point(folder="tests/yaml_files",
+                                   params={"pos": value, "label": "a"},
+                                   modeler=None, name="chip")
+            self.assertEqual(point.pos, value)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_several_files_after_fork(self):
+        elements.Trio(folder="tests/yaml_files", params="trio.yaml",
+                      modeler=None, name="chip")
+        DrawableElement._yaml_cache.clear()
+        pid = os.fork()
+        if pid == 0:
+            # Child process, exits without returning to the test runner.
+            status = 1
+            try:
+                signal.alarm(10)
+                chip = elements.Trio(folder="tests/yaml_files",
+                                     params="trio.yaml",
+                                     modeler=None, name="chip")
+                status = 0 if chip.sample3.param_extra == 42 else 1
+            finally:
+                os._exit(status)  # pylint: disable=W0212
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+
+    def test_variation_lists(self):
+        self.chip = elements.Points(
+            folder="tests/yaml_files",
+            params="points.yaml",
+            modeler=None,
+            name="chip"
+        )
+        self.chip.point[0].pos[0] = "5um"
+        self.assertEqual(self.chip.point.pos, ["0um", "0um"])
+        self.assertEqual(self.chip.point[1].pos, ["0um", "0um"])
+        self.assertEqual(self.chip._dict_params["point"]["pos"],
+                         ["0um", "0um"])
+        self.assertEqual([p.label for p in self.chip.point], ["b", "c"])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,10 @@
-from drawable import DrawableElement
+from drawable import DrawableElement, Variation
 
 import logging
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from unittest import TestCase
 
 logging.basicConfig(format='%(levelname)s:%(message)s', level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,3 +37,124 @@ class Parent(DrawableElement):
         logger.info("parent param_int_123 %d", self.param_int_123)
         logger.info("parent param_int_parent %d", self.param_int_parent)
         self.sample1.draw(body)
+
+
+class Multi(DrawableElement):
+    """Parent holding variations of Sample."""
+
+    sample1: Variation[Sample]
+
+    def _draw(self, body=None, **kwargs) -> None:
+        self.sample1.draw(body)
+
+
+class Inherited(DrawableElement):
+    """Element taking its parameter from its ancestors."""
+
+    param_int_parent: int
+
+    def _draw(self, body=None, **kwargs) -> None:
+        logger.info("inherited %s param_int_parent %d",
+                    self.name, self.param_int_parent)
+
+
+class Middle(DrawableElement):
+    """Element without parameters drawing its children."""
+
+    child1: Inherited
+    child2: Inherited
+
+
+class Root(DrawableElement):
+    """Root defining the parameter used by its grandchildren."""
+
+    middle: Middle
+    param_int_parent: int
+
+
+class ExtendedSample(Sample):
+    """Sample with an additional parameter."""
+
+    param_extra: int
+
+    def _draw(self, body=None, **kwargs) -> None:
+        super()._draw(body, **kwargs)
+        logger.info("extended param_extra %d", self.param_extra)
+
+
+class Trio(DrawableElement):
+    """Element whose children are loaded from several yaml files."""
+
+    sample1: Sample
+    sample2: Sample
+    sample3: ExtendedSample
+
+
+class Point(DrawableElement):
+    """Element holding a list parameter."""
+
+    pos: List[str]
+    label: str
+
+    def _draw(self, body=None, **kwargs) -> None:
+        logger.info("point %s pos %s", self.label, self.pos)
+
+
+class Points(DrawableElement):
+    """Parent holding variations of Point."""
+
+    point: Variation[Point]
+
+
+class RootVariation(DrawableElement):
+    """Root holding variations of Middle."""
+
+    middle: Variation[Middle]
+    param_int_parent: int
+
+
+class Rect(DrawableElement):
+    """Element declaring scalar and list variables."""
+
+    width: str
+    pos: List[str]
+    height: str
+
+
+class FakeModeler:
+    """Modeler recording the variables declared one by one."""
+
+    mode = "hfss"
+
+    def __init__(self):
+        self.declared = []
+
+    def set_variable(self, value, name):
+        self.declared.append(name)
+        return f"{name}={value}"
+
+
+class FakeBatchModeler(FakeModeler):
+    """Modeler also declaring several variables at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def set_variables(self, variables):
+        self.batches.append(list(variables))
+        return {name: self.set_variable(value, name)
+                for name, value in variables.items()}
+
+
+class Scaled(DrawableElement):
+    """Element with a parameter kept out of the modeler."""
+
+    ratio__n: str
+    length: str
+
+
+class Guarded(Sample):
+    """Sample with a private annotation only importable when type checking."""
+
+    _owner: "TestCase"